@@ -2,12 +2,70 @@
 Contains implementation of DB-related features.
 """
 
+import logging
+import queue
+import threading
 import time
-from datetime import datetime, timedelta
-import mysql.connector
-from helpers import get_distance
+from datetime import timedelta
+from mysql.connector import connect, pooling
+from mysql.connector.errors import PoolError
+from helpers import parse_timestamp
 from logger import MonitorLog
 
+# Pool shared by all *Database* handlers of this process, created lazily
+# on the first connection request. The pool opens every connection
+# eagerly and each monitor runs in its own process, which uses at most
+# three at a time (main cursor, writer thread, prefetched get_loc_data),
+# so the size stays small to keep many concurrent monitors well under
+# the MySQL server's connection limit.
+POOL_SIZE = 4
+_CONNECTION_POOL = None
+# serializes the lazy pool construction: the scenario player's threads
+# would otherwise race it and leak a second pool's connections
+_POOL_LOCK = threading.Lock()
+
+# sentinel telling the writer thread to drain and exit
+_WRITER_STOP = object()
+
+
+def _get_connection(config):
+    """
+    Returns a connection from the shared pool, creating the pool
+    on the first call.
+
+    The pool is sized for the per-process monitor case; when a single
+    process hosts more handlers than that (the scenario player replays
+    every file in-process, two connections each), overflow demand is
+    served by dedicated connections instead of failing the caller with
+    a *PoolError*.
+
+    :param config: The system configuration
+    :type config: :class:`Config <helpers.Config>`
+    :returns: A pooled connection, or a dedicated one when the pool
+        is exhausted.
+    :rtype: PooledMySQLConnection or MySQLConnection
+    """
+    global _CONNECTION_POOL
+    if _CONNECTION_POOL is None:
+        with _POOL_LOCK:
+            # re-checked under the lock: another thread may have won
+            # the race while this one was waiting
+            if _CONNECTION_POOL is None:
+                _CONNECTION_POOL = pooling.MySQLConnectionPool(
+                    pool_name='jobmon',
+                    pool_size=POOL_SIZE,
+                    user=config.database_user,
+                    password=config.database_password,
+                    host=config.database_host,
+                    database=config.database_name)
+    try:
+        return _CONNECTION_POOL.get_connection()
+    except PoolError:
+        return connect(user=config.database_user,
+                       password=config.database_password,
+                       host=config.database_host,
+                       database=config.database_name)
+
 
 class Database(object):
     """ Implements all interactions with the DB. """
@@ -22,7 +80,7 @@ class Database(object):
         :param truck_id: The truck ID
         :type truck_id: int
         :param config: The system configuration
-        :type config: dict
+        :type config: :class:`Config <helpers.Config>`
         """
         self.config = config
         self.job_id = job_id
@@ -31,7 +89,25 @@ class Database(object):
         self.db_connection = None
         self.cursor = None
         self.__init_db(config)
-        self.active = bool(config['activate_queries'])
+        self.active = bool(config.activate_queries)
+        # squared once here so the per-pickup scan never recomputes it
+        self.__pickup_radius_sq = config.pickup_check_distance_window ** 2
+        # per-handler caches: the task list is static for the job's
+        # lifetime, the drop-location alert flags are invalidated by
+        # every write that touches the alerts table
+        self.__task_data = None
+        self.__dl_alert_cache = {}
+        # latest RFID timestamp seen by __wait_for_rfid_data; lets
+        # later waits short-circuit when RFID has already caught up
+        self._last_rfid_ts = None
+        self.write_q = queue.Queue()
+        # set by the writer thread when it cannot reach the DB at all;
+        # flush_writes raises on it instead of silently returning after
+        # the writes were dropped
+        self.__writer_failed = False
+        self.__writer_thread = threading.Thread(target=self.__drain_writes)
+        self.__writer_thread.daemon = True
+        self.__writer_thread.start()
 
     def __init_db(self, config):
         """
@@ -39,20 +115,140 @@ class Database(object):
         specified in the system configuration.
 
         :param config: The system configuration
-        :type config: dict
-        """
-        self.db_connection = mysql.connector.connect(user=config['database_user'],
-                                                     password=config['database_password'],
-                                                     host=config['database_host'],
-                                                     database=config['database_name'])
-        self.cursor = self.db_connection.cursor(dictionary=True)
-        self.cursor.execute('SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED;')
+        :type config: :class:`Config <helpers.Config>`
+        """
+        self.db_connection = _get_connection(config)
+        # prepared=True makes the server parse each statement once per
+        # connection and reuse the plan on subsequent executions
+        self.cursor = self.db_connection.cursor(dictionary=True, prepared=True)
+        # READ COMMITTED is the server-level default (see migrations),
+        # so no per-connection SET SESSION round-trip is needed
+
+    def __drain_writes(self):
+        """
+        Consumes the write queue on a dedicated pooled connection.
+
+        Write methods enqueue *(sql, params, many)* tuples instead of
+        executing them inline, so the event-processing thread only pays
+        the cost of an in-memory put while this thread overlaps the
+        actual DB I/O with subsequent event processing. The cursor lives
+        entirely in this thread, preserving the connector's thread-safety
+        requirements.
+        """
+        try:
+            connection = _get_connection(self.config)
+            cursor = connection.cursor(prepared=True)
+        except Exception as exception:
+            # without a connection this thread must still consume the
+            # queue: unacknowledged entries would leave every
+            # flush_writes caller blocked on join() forever
+            self.log.exception(
+                'writer could not acquire a connection: {}'.format(exception))
+            self.__writer_failed = True
+            while True:
+                entry = self.write_q.get()
+                self.write_q.task_done()
+                if entry is _WRITER_STOP:
+                    return
+                self.log.info('write dropped: writer has no connection')
+        while True:
+            entry = self.write_q.get()
+            if entry is _WRITER_STOP:
+                self.write_q.task_done()
+                break
+            try:
+                # a list entry is a batch: its statements apply in one
+                # transaction, paying a single commit
+                statements = entry if isinstance(entry, list) else [entry]
+                for sql, params, many in statements:
+                    if many:
+                        cursor.executemany(sql, params)
+                    else:
+                        cursor.execute(sql, params)
+                connection.commit()
+            except Exception as exception:
+                # a failed write must not kill this thread: entries
+                # enqueued afterwards would never execute and the
+                # task_done accounting would leave every subsequent
+                # flush_writes caller blocked forever
+                try:
+                    connection.rollback()
+                except Exception:
+                    # the rollback itself can fail on a lost
+                    # connection; the log line below still records
+                    # the original failure
+                    pass
+                self.log.exception(
+                    'write failed and was rolled back: {}'.format(exception))
+            finally:
+                self.write_q.task_done()
+        cursor.close()
+        connection.close()
+
+    def _enqueue_write(self, sql, params, many=False):
+        """
+        Hands a statement to the writer thread.
+
+        :param sql: The statement to execute.
+        :type sql: str
+        :param params: The bound parameters (or rows, when **many**).
+        :type params: tuple or list
+        :param many: Whether to dispatch through *executemany*.
+        :type many: bool
+        """
+        self.write_q.put((sql, params, many))
+
+    def _enqueue_batch(self, statements):
+        """
+        Hands a group of statements to the writer thread to be applied
+        in a single transaction with one commit.
+
+        :param statements: The *(sql, params, many)* tuples to execute.
+        :type statements: list
+        """
+        self.write_q.put(statements)
+
+    def flush_writes(self):
+        """
+        Blocks until all queued writes have been applied.
+
+        Read methods whose results depend on previously enqueued
+        writes (e.g. the alert checks) call this first, so callers
+        never observe the DB behind their own writes.
+
+        :raises RuntimeError: When the writer thread never obtained a
+            connection and the queued writes were dropped.
+        """
+        self.write_q.join()
+        if self.__writer_failed:
+            raise RuntimeError('queued writes were dropped: '
+                               'the writer thread has no DB connection')
 
     def close_db(self):
         """
-        Closes the connection to the DB.
+        Closes the connection to the DB, draining any queued
+        writes first.
+
+        As the connection comes from the shared pool, closing it
+        returns it to the pool instead of tearing it down.
+
+        Repeated calls are no-ops: the deactivation path closes the
+        handler before exiting and the monitor's shutdown clean-up
+        closes it again.
         """
+        if self.db_connection is None:
+            return
+        self.write_q.put(_WRITER_STOP)
+        self.__writer_thread.join()
         self.db_connection.close()
+        self.db_connection = None
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close_db()
 
     def is_job_active(self):
         """
@@ -62,8 +258,8 @@ class Database(object):
             manually deactivated.
         :rtype: bool
         """
-        sql = "SELECT active FROM jobs WHERE id={}".format(self.job_id)
-        self.cursor.execute(sql)
+        sql = "SELECT active FROM jobs WHERE id=%s"
+        self.cursor.execute(sql, (self.job_id,))
         job = self.cursor.fetchone()
         if job is None:
             return False
@@ -79,25 +275,20 @@ class Database(object):
             *Database* handler's assigned job ID.
         :rtype: list of dicts
         """
+        if self.__task_data is not None:
+            return self.__task_data
         sql = """
-        SELECT jt.id, t.model, t.origin AS origin_id, t.destination AS destination_id
+        SELECT jt.id, t.model, t.origin AS origin, t.destination AS dest
         FROM job_tasks AS jt
         INNER JOIN jobs AS j ON (jt.job_id = j.id)
         INNER JOIN tasks AS t ON (jt.task_id = t.id)
         INNER JOIN tasks_lists AS tl ON (t.task_list_id = tl.id)
         INNER JOIN geo_features AS o ON (t.origin = o.id)
         INNER JOIN geo_features AS d ON (t.destination = d.id)
-        WHERE jt.job_id={}""".format(self.job_id)
-        self.cursor.execute(sql)
-        task_data = self.cursor.fetchall()
-        tasks = []
-        for task in task_data:
-            tasks.append({
-                'id': task['id'],
-                'model': task['model'],
-                'origin': task['origin_id'],
-                'dest': task['destination_id']})
-        return tasks
+        WHERE jt.job_id=%s"""
+        self.cursor.execute(sql, (self.job_id,))
+        self.__task_data = self.cursor.fetchall()
+        return self.__task_data
 
     def get_loc_data(self, curr_loc_time):
         """
@@ -106,18 +297,33 @@ class Database(object):
         :param curr_loc_time: The minimum timestamp of
             extracted location data.
         :type curr_loc_time: str
-        :returns: The list of selected location data, sorted by timestamp
-            in ascending order.
-        :rtype: list of tuples
+        :returns: The selected location data, sorted by timestamp in
+            ascending order. Rows are streamed in chunks on a dedicated
+            pooled connection instead of being materialized at once, so
+            arbitrarily large location windows replay in constant
+            memory; the handler's main cursor stays free for the queries
+            callers issue while iterating.
+        :rtype: generator of dicts
         """
         sql = """
         SELECT loc_data.geo_feature_id, x(coordinates) AS x, y(coordinates) AS y, timestamp, \
         speed, clamp_status, gf.type AS type FROM loc_data \
         INNER JOIN geo_features AS gf ON (loc_data.geo_feature_id = gf.id) \
-        WHERE truck_id={} AND timestamp > '{}' \
-        ORDER BY timestamp ASC""".format(self.truck_id, curr_loc_time)
-        self.cursor.execute(sql)
-        return self.cursor.fetchall()
+        WHERE truck_id=%s AND timestamp > %s \
+        ORDER BY timestamp ASC"""
+        connection = _get_connection(self.config)
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, (self.truck_id, curr_loc_time))
+            while True:
+                rows = cursor.fetchmany(1024)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            cursor.close()
+            connection.close()
 
     def has_active_alerts(self):
         """
@@ -128,11 +334,12 @@ class Database(object):
             *False* otherwise.
         :rtype: bool
         """
+        self.flush_writes()
         sql = "SELECT id FROM alerts \
-        WHERE job_id = {} \
+        WHERE job_id = %s \
         AND active = 1 AND type != 'clamps_closed_event'\
-        AND type != 'clamps_closed_warning'".format(self.job_id)
-        self.cursor.execute(sql)
+        AND type != 'clamps_closed_warning'"
+        self.cursor.execute(sql, (self.job_id,))
         if not self.cursor.fetchall():
             return False
         return True
@@ -149,43 +356,111 @@ class Database(object):
             alerts of type *drop_location*, *False* otherwise.
         :rtype: bool
         """
+        if loc_id in self.__dl_alert_cache:
+            return self.__dl_alert_cache[loc_id]
+        self.flush_writes()
         sql = "SELECT id FROM alerts \
-        WHERE job_id = {} \
+        WHERE job_id = %s \
         AND active = 1 AND type = 'drop_location' \
-        AND loc_id = {}".format(self.job_id, loc_id)
-        self.cursor.execute(sql)
-        if not self.cursor.fetchall():
-            return False
-        return True
+        AND loc_id = %s"
+        self.cursor.execute(sql, (self.job_id, loc_id))
+        result = bool(self.cursor.fetchall())
+        self.__dl_alert_cache[loc_id] = result
+        return result
+
+    def get_dl_alert_origins(self, origins):
+        """
+        Returns the subset of the specified origins that have active
+        *drop_location* alerts.
+
+        A single query flags every origin at once, so drop checks on
+        multi-item loads avoid one alert lookup per sensed item.
+        Results are kept in the same per-location cache used by
+        :func:`loc_has_active_dl_alerts
+        <database.Database.loc_has_active_dl_alerts>`.
+
+        :param origins: The location IDs to check.
+        :type origins: set
+
+        :returns: The origins with active *drop_location* alerts.
+        :rtype: set
+        """
+        uncached = [loc_id for loc_id in origins if loc_id not in self.__dl_alert_cache]
+        if uncached:
+            self.flush_writes()
+            sql = "SELECT DISTINCT loc_id FROM alerts \
+            WHERE job_id = %s \
+            AND active = 1 AND type = 'drop_location' \
+            AND loc_id IN ({})".format(','.join(['%s'] * len(uncached)))
+            self.cursor.execute(sql, [self.job_id] + uncached)
+            flagged = {row['loc_id'] for row in self.cursor.fetchall()}
+            for loc_id in uncached:
+                self.__dl_alert_cache[loc_id] = loc_id in flagged
+        return {loc_id for loc_id in origins if self.__dl_alert_cache[loc_id]}
+
+    def has_noe_alerts(self):
+        """
+        Returns whether this job has currently active
+        *Cannot_Place_Alert* or *Damaged_Item* alerts.
+
+        Either alert type makes the NOE location an admissible drop
+        destination, so both are probed with one existence query.
+
+        :returns: *True* if the monitored job has active alerts of
+            either type, *False* otherwise.
+        :rtype: bool
+        """
+        self.flush_writes()
+        sql = "SELECT 1 FROM alerts \
+        WHERE job_id = %s \
+        AND active = 1 AND type IN ('Cannot_Place_Alert', 'Damaged_Item') \
+        LIMIT 1"
+        self.cursor.execute(sql, (self.job_id,))
+        return self.cursor.fetchone() is not None
 
     def __wait_for_rfid_data(self, target_timestamp):
         """
         Waits until RFID data more recent than the specified timestamp is found.
 
-        The wait times out after the number of seconds specified in the system
-        configuration in the *rfid_wait_timeout* option.
+        Polling starts at a 20 ms delay and backs off exponentially up to
+        one second, so the common case - RFID data arriving shortly after
+        the event - is detected within milliseconds instead of a fixed
+        one-second grid. The wait gives up once the accumulated delays
+        reach the number of seconds specified in the system configuration
+        in the *rfid_wait_timeout* option.
+
+        When the RFID timestamp observed by a previous wait already
+        covers the target, the method returns immediately without
+        issuing a query - at steady state RFID ingestion keeps ahead of
+        event processing, so this fast path is the common case.
 
         :param target_timestamp: The minimum RFID timestamp this method
             should wait for.
         :type target_timestamp: datetime
         """
+        if self._last_rfid_ts is not None and self._last_rfid_ts >= target_timestamp:
+            return
         sql = "SELECT latest_rfid_timestamp \
         FROM clamp_trucks \
-        WHERE id={}".format(self.truck_id)
+        WHERE id=%s"
 
-        db_tvalue = datetime.strptime('1970-01-01 00:00:00.000', '%Y-%m-%d %H:%M:%S.%f')
-        i = 0
+        delay = 0.02
+        waited = 0
 
-        while target_timestamp > db_tvalue and i < self.config['rfid_wait_timeout']:
-            self.cursor.execute(sql)
+        while waited < self.config.rfid_wait_timeout:
+            self.cursor.execute(sql, (self.truck_id,))
             result = self.cursor.fetchone()
             if result is None:
                 return
             db_tvalue = result['latest_rfid_timestamp']
-            self.log.info("Latest RFID timestamp is {}".format(db_tvalue))
-            if db_tvalue is None or db_tvalue < target_timestamp:
-                time.sleep(1)
-            i += 1
+            self.log.info("Latest RFID timestamp is %s", db_tvalue)
+            if db_tvalue is not None:
+                self._last_rfid_ts = db_tvalue
+                if db_tvalue >= target_timestamp:
+                    return
+            time.sleep(delay)
+            waited += delay
+            delay = min(delay * 2, 1.0)
 
     def __get_load_data(self, min_time, max_time):
         """
@@ -205,22 +480,15 @@ class Database(object):
         :rtype: list of dicts
         """
         self.__wait_for_rfid_data(max_time)
-        sql = "SELECT item.* FROM detected_items \
+        sql = "SELECT item.id, item.model, item.curr_loc_id AS item_origin, \
+        item.serial_lock, NULL AS correct_loc_id FROM detected_items \
         INNER JOIN items AS item ON (detected_items.items_item_tag = item.item_tag) \
-        WHERE clamp_truck_id={} AND timestamp >= '{}' AND timestamp <= '{}' \
-        GROUP BY item.id".format(self.truck_id, min_time, max_time)
-        self.log.info(sql)
-        self.cursor.execute(sql)
-        item_data = self.cursor.fetchall()
-        items = []
-        for item in item_data:
-            items.append({
-                'id': item['id'],
-                'model': item['model'],
-                'item_origin': item['curr_loc_id'],
-                'serial_lock': item['serial_lock'],
-                'correct_loc_id': None})
-        return items
+        WHERE clamp_truck_id=%s AND timestamp >= %s AND timestamp <= %s \
+        GROUP BY item.id"
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info(sql)
+        self.cursor.execute(sql, (self.truck_id, min_time, max_time))
+        return self.cursor.fetchall()
 
     def __get_load_data_inside_circle(self, event_coords, event_time):
         """
@@ -251,21 +519,22 @@ class Database(object):
             area.
         :rtype: list of dicts
         """
-        max_time = datetime.strptime(event_time, '%Y-%m-%d %H:%M:%S.%f')
+        max_time = parse_timestamp(event_time)
         min_time = max_time - timedelta(seconds=60)
-        sql = "SELECT x(coordinates) AS x, y(coordinates) AS y, timestamp \
+        # the boundary search runs server-side: only the latest row outside
+        # the pickup circle crosses the wire, with squared distances
+        # compared against the squared radius
+        sql = "SELECT timestamp \
         FROM loc_data \
-        WHERE truck_id={} AND timestamp >= '{}' AND timestamp <= '{}' \
-        ORDER BY timestamp DESC".format(self.truck_id, min_time, max_time)
-        self.cursor.execute(sql)
-        loc_data = self.cursor.fetchall()
-        load_query_start_time = min_time
-        load_query_end_time = max_time + timedelta(seconds=self.config['pickup_post_seconds'])
-        for location in loc_data:
-            pickup_distance = get_distance(event_coords, location)
-            if pickup_distance >= self.config['pickup_check_distance_window']:
-                load_query_start_time = location['timestamp']
-                break
+        WHERE truck_id=%s AND timestamp >= %s AND timestamp <= %s \
+        AND POW(x(coordinates)-%s, 2) + POW(y(coordinates)-%s, 2) >= %s \
+        ORDER BY timestamp DESC LIMIT 1"
+        self.cursor.execute(sql, (self.truck_id, min_time, max_time,
+                                  event_coords['x'], event_coords['y'],
+                                  self.__pickup_radius_sq))
+        boundary = self.cursor.fetchone()
+        load_query_start_time = min_time if boundary is None else boundary['timestamp']
+        load_query_end_time = max_time + timedelta(seconds=self.config.pickup_post_seconds)
 
         return self.__get_load_data(load_query_start_time, load_query_end_time)
 
@@ -290,10 +559,10 @@ class Database(object):
             time interval.
         :rtype: list of dicts
         """
-        self.log.info("\nRetrieving data for drop at {}".format(drop_time))
-        query_drop_time = datetime.strptime(drop_time, '%Y-%m-%d %H:%M:%S.%f')
-        query_end_time = datetime.strptime(max_time, '%Y-%m-%d %H:%M:%S.%f')
-        query_start_time = query_drop_time - timedelta(seconds=self.config['drop_pre_seconds'])
+        self.log.info("\nRetrieving data for drop at %s", drop_time)
+        query_drop_time = parse_timestamp(drop_time)
+        query_end_time = parse_timestamp(max_time)
+        query_start_time = query_drop_time - timedelta(seconds=self.config.drop_pre_seconds)
         return self.__get_load_data(query_start_time, query_end_time)
 
     def get_pickup_data(self, pickup_coords, pickup_time):
@@ -313,15 +582,15 @@ class Database(object):
         :returns: The list of item IDs detected by the RFID reader at this pickup.
         :rtype: list of ints
         """
-        self.log.info("\nRetrieving data for pickup at {} in {}".format(pickup_time, pickup_coords))
+        self.log.info("\nRetrieving data for pickup at %s in %s", pickup_time, pickup_coords)
         inner_pickup_items = self.__get_load_data_inside_circle(pickup_coords, pickup_time)
-        self.log.info('Pickup items: {}'.format(inner_pickup_items))
+        self.log.info('Pickup items: %s', inner_pickup_items)
 
         inner_pickup_ids = []
         for item in inner_pickup_items:
             inner_pickup_ids.append(item['id'])
 
-        self.log.info('Inner pickup IDs: {}'.format(inner_pickup_ids))
+        self.log.info('Inner pickup IDs: %s', inner_pickup_ids)
         return inner_pickup_ids
 
     def get_item_data(self, item_ids):
@@ -335,22 +604,12 @@ class Database(object):
         """
         if not item_ids:
             return []
-        sql = 'SELECT * ' \
+        sql = 'SELECT id, model, curr_loc_id AS item_origin, ' \
+              'serial_lock, NULL AS correct_loc_id ' \
               'FROM items ' \
-              'WHERE id IN ('
-        sql += ','.join(str(item_id) for item_id in item_ids)
-        sql += ')'
-        self.cursor.execute(sql)
-        item_data = self.cursor.fetchall()
-        items = []
-        for item in item_data:
-            items.append({
-                'id': item['id'],
-                'model': item['model'],
-                'item_origin': item['curr_loc_id'],
-                'serial_lock': item['serial_lock'],
-                'correct_loc_id': None})
-        return items
+              'WHERE id IN ({})'.format(','.join(['%s'] * len(item_ids)))
+        self.cursor.execute(sql, tuple(item_ids))
+        return self.cursor.fetchall()
 
     def save_item_loc(self, item, loc):
         """
@@ -361,11 +620,30 @@ class Database(object):
         :param loc: The item's new location.
         :type loc: int
         """
-        sql = "UPDATE items SET curr_loc_id=%i WHERE id=%i" % (loc, item['id'])
+        self.save_item_locs([(loc, item['id'])])
+
+    def save_item_locs(self, pairs):
+        """
+        Updates the location of several items in a single statement.
+
+        All updates travel as one multi-row upsert committed once, so
+        drop events with many items pay a single round-trip instead of
+        one per item; rows whose *curr_loc_id* already matches are
+        skipped by MySQL without a write.
+
+        :param pairs: The *(location ID, item ID)* pairs to apply.
+        :type pairs: list of tuples
+        """
+        if not pairs:
+            return
+        sql = "INSERT INTO items (id, curr_loc_id) VALUES "
+        sql += ",".join(["(%s, %s)"] * len(pairs))
+        sql += " ON DUPLICATE KEY UPDATE curr_loc_id = VALUES(curr_loc_id)"
+        params = []
+        for loc, item_id in pairs:
+            params.extend([item_id, loc])
         if self.active:
-            self.cursor.execute(sql)
-            self.db_connection.commit()
-        # print(sql)
+            self._enqueue_write(sql, tuple(params))
 
     def create_alert(self, alert_loc, alert_type, wrong_items, event_time):
         """
@@ -381,25 +659,20 @@ class Database(object):
         :type event_time: str
         """
         sql = "INSERT INTO alerts \
-        (loc_id, item_id, job_id, timestamp, type, active, correct_loc_id) VALUES "
+        (loc_id, item_id, job_id, timestamp, type, active, correct_loc_id) \
+        VALUES (%s, %s, %s, %s, %s, 1, %s)"
         # if not wrong_items passed in then its a location only alert
         if not wrong_items:
-            sql += "({}, NULL, {}, '{}', '{}', 1, NULL)".format(
-                alert_loc, self.job_id, event_time, alert_type)
+            rows = [(alert_loc, None, self.job_id, event_time, alert_type, None)]
         else:
-            for item in wrong_items:
-                if item['correct_loc_id'] is None:
-                    sql += "({}, '{}', {}, '{}', '{}', 1, NULL),".format(
-                        alert_loc, item['id'], self.job_id, event_time, alert_type)
-                else:
-                    sql += "({}, '{}', {}, '{}', '{}', 1, {}),".format(
-                        alert_loc, item['id'],
-                        self.job_id, event_time, alert_type, item['correct_loc_id'])
-            sql = sql.rstrip(',')
+            rows = [(alert_loc, item['id'], self.job_id,
+                     event_time, alert_type, item['correct_loc_id'])
+                    for item in wrong_items]
         if self.active:
-            self.cursor.execute(sql)
-            self.db_connection.commit()
-        self.log.info(sql)
+            self.__dl_alert_cache.clear()
+            self._enqueue_write(sql, rows, many=True)
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info('%s %s', sql, rows)
 
     def get_model_alerts(self, item):
         """
@@ -410,12 +683,13 @@ class Database(object):
         :return: The alert, or *None* if none is found.
         :rtype: list
         """
+        self.flush_writes()
         sql = "SELECT a.id \
                 FROM alerts a INNER JOIN items i ON (a.item_id = i.id) \
-                WHERE a.job_id = {} \
-                AND a.active = 1 AND a.loc_id = {} \
-                AND i.model = '{}'".format(self.job_id, item['item_origin'], item['model'])
-        self.cursor.execute(sql)
+                WHERE a.job_id = %s \
+                AND a.active = 1 AND a.loc_id = %s \
+                AND i.model = %s"
+        self.cursor.execute(sql, (self.job_id, item['item_origin'], item['model']))
         return self.cursor.fetchall()
 
     def cancel_alert(self, alert_id):
@@ -427,9 +701,9 @@ class Database(object):
         if not self.active:
             return
         sql = "UPDATE alerts SET active = 0 \
-        WHERE job_id = {} AND id = {}".format(self.job_id, alert_id)
-        self.cursor.execute(sql)
-        self.db_connection.commit()
+        WHERE job_id = %s AND id = %s"
+        self.__dl_alert_cache.clear()
+        self._enqueue_write(sql, (self.job_id, alert_id))
 
     def cancel_alerts(self, alert_type):
         """
@@ -441,9 +715,9 @@ class Database(object):
         if not self.active:
             return
         sql = "UPDATE alerts SET active = 0 \
-        WHERE job_id = {} AND type = '{}'".format(self.job_id, alert_type)
-        self.cursor.execute(sql)
-        self.db_connection.commit()
+        WHERE job_id = %s AND type = %s"
+        self.__dl_alert_cache.clear()
+        self._enqueue_write(sql, (self.job_id, alert_type))
 
     def cancel_item_alerts(self, items):
         """
@@ -454,11 +728,10 @@ class Database(object):
         """
         if not self.active:
             return
-        for item in items:
-            sql = "UPDATE alerts SET active = 0 \
-                  WHERE job_id = {} AND item_id = {}".format(self.job_id, item['id'])
-            self.cursor.execute(sql)
-            self.db_connection.commit()
+        sql = "UPDATE alerts SET active = 0 \
+              WHERE job_id = %s AND item_id = %s"
+        self.__dl_alert_cache.clear()
+        self._enqueue_write(sql, [(self.job_id, item['id']) for item in items], many=True)
 
     def cancel_model_alerts(self, model, loc_id):
         """
@@ -474,11 +747,12 @@ class Database(object):
         self.log.info('\nCanceling model alerts')
         sql = "UPDATE alerts a INNER JOIN items i ON (a.item_id = i.id) \
         SET a.active = 0 \
-        WHERE i.model = '{}' AND a.job_id = {} \
-        AND a.loc_id = {}".format(model, self.job_id, loc_id)
-        self.log.info(sql)
-        self.cursor.execute(sql)
-        self.db_connection.commit()
+        WHERE i.model = %s AND a.job_id = %s \
+        AND a.loc_id = %s"
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info(sql)
+        self.__dl_alert_cache.clear()
+        self._enqueue_write(sql, (model, self.job_id, loc_id))
 
     def cancel_remaining_tasks_alert(self, loc_id):
         """
@@ -489,39 +763,10 @@ class Database(object):
         """
         sql = "UPDATE alerts SET active = 0 \
               WHERE type = 'remaining_tasks' \
-              AND job_id = {} AND loc_id = {}".format(self.job_id, loc_id)
+              AND job_id = %s AND loc_id = %s"
         if self.active:
-            self.cursor.execute(sql)
-            self.db_connection.commit()
-
-    def save_job(self, start_time, finish_time, carries):
-        """
-        Updates job when it is completed.
-
-        This method updates the job's row in the database, setting its
-        status to *1*, and also updating the total number of carries and trips.
-        The start and finish time are also updated with the actual start and
-        completion timestamps.
-
-        :param start_time: The job's start time.
-        :type start_time: str
-        :param finish_time: The job's completion time.
-        :type finish_time: str
-        :param carries: The carries detected during this job.
-        :type carries: list
-        """
-        trip_count = 0
-        for carry in carries:
-            trip_count += len(carry.trips)
-        sql = "UPDATE jobs SET start_time='{}', finish_time='{}', status=1, " \
-              "total_carries={}, total_trips={} " \
-              "WHERE id={} " \
-            .format(start_time, finish_time, len(carries), trip_count, self.job_id)
-        if self.active:
-            self.cursor.execute(sql)
-            self.db_connection.commit()
-        # print('\n')
-        # print(sql)
+            self.__dl_alert_cache.clear()
+            self._enqueue_write(sql, (self.job_id, loc_id))
 
     def save_task(self, task):
         """
@@ -539,67 +784,59 @@ class Database(object):
         :type task: :class:`Task <models.Task>`
         """
         sql = "UPDATE job_tasks \
-                SET item_id={}, status=1, start_time='{}', finish_time='{}', avg_speed={} \
-                WHERE id={}" \
-            .format(task.item_id, task.start_time, task.finish_time, task.avg_speed, task.task_id)
+                SET item_id=%s, status=1, start_time=%s, finish_time=%s, avg_speed=%s \
+                WHERE id=%s"
         if self.active:
-            self.cursor.execute(sql)
-            self.db_connection.commit()
+            self._enqueue_write(sql, (task.item_id, task.start_time,
+                                      task.finish_time, task.avg_speed, task.task_id))
 
-    def save_carries(self, carries):
+    def save_job_and_carries(self, start_time, finish_time, carries):
         """
-        Inserts all carries and trips into the DB.
+        Persists the completed job together with all its carries and
+        trips.
 
         This method is invoked when the job is completed, and all carry
-        and trip analytics have been generated.
+        and trip analytics have been generated. The carry rows, the
+        trip rows and the job update are applied in one transaction
+        with a single commit, instead of the separate commits the
+        individual statements used to pay.
 
-        :param carries: The carries to insert into the database.
+        :param start_time: The job's start time.
+        :type start_time: str
+        :param finish_time: The job's completion time.
+        :type finish_time: str
+        :param carries: The carries detected during this job.
         :type carries: list of :class:`Carry <models.Carry>`
         """
-        sql = "INSERT INTO carries (job_id, carry_number, start_time, finish_time, unit_count, "
-        sql += "total_trips, origin, destination, stow_time, dock_time, total_distance, \
-                avg_trip_distance, avg_trip_time) VALUES "
+        carry_sql = "INSERT INTO carries (job_id, carry_number, start_time, finish_time, unit_count, "
+        carry_sql += "total_trips, origin, destination, stow_time, dock_time, total_distance, \
+                avg_trip_distance, avg_trip_time) VALUES \
+                (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+        trip_sql = "INSERT INTO carry_trips (job_id, carry_number, origin, destination, distance, "
+        trip_sql += "avg_speed, travel_time, start_time, finish_time) VALUES \
+                (%s, %s, %s, %s, %s, %s, %s, %s, %s)"
+        job_sql = "UPDATE jobs SET start_time=%s, finish_time=%s, status=1, " \
+                  "total_carries=%s, total_trips=%s " \
+                  "WHERE id=%s"
+        carry_rows = []
+        trip_rows = []
         for carry in carries:
-            sql += "({}, {}, '{}', '{}', {}, {}, '{}', '{}', {}, {}, {}, {}, {})," \
-                .format(
-                    self.job_id,
-                    carry.carry_num,
-                    carry.start_time,
-                    carry.finish_time,
-                    carry.unit_count,
-                    len(carry.trips),
-                    carry.origin,
-                    carry.dest,
-                    int(carry.stow_time),
-                    int(carry.dock_time),
-                    carry.total_distance,
-                    carry.avg_trip_distance,
-                    carry.avg_trip_time)
-        if self.active:
-            self.cursor.execute(sql.rstrip(','))
-            self.db_connection.commit()
-
-        for carry in carries:
-            self.__save_trips(carry)
-        # print('\n')
-        # print(sql)
-
-    def __save_trips(self, carry):
-        """
-        Inserts all trips into the DB.
-
-        This method is invoked by
-        :func:`save_carries <database.Database.save_carries>`
-        on each carry.
-
-        :param carry: The carry whose trips must be inserted into the database.
-        :type carry: :class:`Carry <models.Carry>`
-        """
-        sql = "INSERT INTO carry_trips (job_id, carry_number, origin, destination, distance, "
-        sql += "avg_speed, travel_time, start_time, finish_time) VALUES "
-        for trip in carry.trips:
-            sql += "({}, {}, {}, {}, {}, {}, {}, '{}', '{}')," \
-                .format(
+            carry_rows.append((
+                self.job_id,
+                carry.carry_num,
+                carry.start_time,
+                carry.finish_time,
+                carry.unit_count,
+                len(carry.trips),
+                carry.origin,
+                carry.dest,
+                int(carry.stow_time),
+                int(carry.dock_time),
+                carry.total_distance,
+                carry.avg_trip_distance,
+                carry.avg_trip_time))
+            for trip in carry.trips:
+                trip_rows.append((
                     self.job_id,
                     trip.carry_num,
                     trip.origin,
@@ -608,8 +845,14 @@ class Database(object):
                     trip.avg_speed,
                     trip.travel_time,
                     trip.start_time,
-                    trip.finish_time)
-        self.log.info(sql)
-        if self.active:
-            self.cursor.execute(sql.rstrip(','))
-            self.db_connection.commit()
+                    trip.finish_time))
+        if not self.active:
+            return
+        statements = []
+        if carry_rows:
+            statements.append((carry_sql, carry_rows, True))
+        if trip_rows:
+            statements.append((trip_sql, trip_rows, True))
+        statements.append((job_sql, (start_time, finish_time, len(carries),
+                                     len(trip_rows), self.job_id), False))
+        self._enqueue_batch(statements)
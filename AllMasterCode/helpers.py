@@ -4,25 +4,103 @@ Miscellaneous utility functions.
 
 import sys
 import json
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from math import sqrt
 
+# the timestamp layout shared by all loc_data/RFID producers
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+@lru_cache(maxsize=2048)
+def parse_timestamp(timestamp):
+    """
+    Parses a timestamp string in the system-wide format.
+
+    Results are memoized, as the same timestamp strings are parsed
+    repeatedly on the location and event paths. Parsing goes through
+    the C-implemented *fromisoformat*, which handles the
+    *TIMESTAMP_FORMAT* shape directly and is an order of magnitude
+    faster than *strptime*.
+
+    :param timestamp: The timestamp to parse.
+    :type timestamp: str
+    :returns: The parsed timestamp.
+    :rtype: datetime
+    """
+    return datetime.fromisoformat(timestamp)
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(**_kwargs):
+        """ No-op stand-in used when Numba is not installed. """
+        def decorate(function):
+            return function
+        return decorate
+
+
+@njit(fastmath=True, cache=True)
+def get_sqdistance(coord1_x, coord1_y, coord2_x, coord2_y):
+    """
+    Returns the squared distance between two 2D coordinates.
+
+    Callers comparing against a fixed radius should compare this
+    against the squared radius, avoiding the square root of
+    :func:`get_distance <helpers.get_distance>`. The scalar signature
+    keeps the function compilable by Numba when it is available.
+
+    :param coord1_x: The first coordinate's x value.
+    :param coord1_y: The first coordinate's y value.
+    :param coord2_x: The second coordinate's x value.
+    :param coord2_y: The second coordinate's y value.
+    :returns: The squared distance between the specified coordinates.
+    :rtype: number
+
+    """
+    delta_x = coord1_x - coord2_x
+    delta_y = coord1_y - coord2_y
+    return delta_x * delta_x + delta_y * delta_y
+
+
+@njit(fastmath=True, cache=True)
+def _distance(coord1_x, coord1_y, coord2_x, coord2_y):
+    """
+    Returns the distance between two 2D coordinates given as scalars.
+
+    This is the compiled kernel behind
+    :func:`get_distance <helpers.get_distance>`; the scalar signature
+    keeps it compilable by Numba when it is available.
+
+    :param coord1_x: The first coordinate's x value.
+    :param coord1_y: The first coordinate's y value.
+    :param coord2_x: The second coordinate's x value.
+    :param coord2_y: The second coordinate's y value.
+    :returns: The distance between the specified coordinates.
+    :rtype: number
+
+    """
+    delta_x = coord1_x - coord2_x
+    delta_y = coord1_y - coord2_y
+    return sqrt(delta_x * delta_x + delta_y * delta_y)
+
 
 def get_distance(coord1, coord2):
     """
     Returns the distance between two 2D coordinates.
 
+    The dict unpacking happens once here; the arithmetic runs in the
+    compiled :func:`_distance <helpers._distance>` kernel, which is
+    called per location tick by the trip distance accumulator.
+
     :param coord1: The first 2D coordinate.
     :param coord2: The second 2D coordinate.
     :returns: The distance between the specified coordinates.
     :rtype: number
 
     """
-    coord1_x = coord1['x']
-    coord1_y = coord1['y']
-    coord2_x = coord2['x']
-    coord2_y = coord2['y']
-    return sqrt(((coord1_x - coord2_x) ** 2) + ((coord1_y - coord2_y) ** 2))
+    return _distance(coord1['x'], coord1['y'], coord2['x'], coord2['y'])
 
 
 def get_time_delta(prev_loc_time, curr_loc_time):
@@ -37,18 +115,43 @@ def get_time_delta(prev_loc_time, curr_loc_time):
     :rtype: number
 
     """
-    curr_time = datetime.strptime(curr_loc_time, '%Y-%m-%d %H:%M:%S.%f')
-    prev_time = datetime.strptime(prev_loc_time, '%Y-%m-%d %H:%M:%S.%f')
-    time_diff = curr_time - prev_time
+    time_diff = parse_timestamp(curr_loc_time) - parse_timestamp(prev_loc_time)
     return time_diff.total_seconds()
 
 
+@dataclass(frozen=True)
+class Config(object):
+    """
+    The parsed and validated system configuration.
+
+    Values are read through attribute access, which is cheaper than
+    dict lookups on the hot paths, and the instance is immutable so
+    it can safely be shared across monitors and threads.
+    """
+    pickup_check_distance_trigger: float
+    pickup_check_distance_window: float
+    pickup_post_seconds: float
+    drop_check_distance: float
+    drop_pre_seconds: float
+    job_manager_port: int
+    rfid_wait_timeout: int
+    database_name: str
+    database_password: str
+    database_user: str
+    database_host: str
+    activate_queries: bool
+
+
+@lru_cache(maxsize=1)
 def get_config():
     """
     Loads and parses the configuration file.
 
+    The parsed configuration is cached, so repeated calls (workers,
+    monitors, re-imports) read and validate the file only once.
+
     :returns: The loaded configuration.
-    :rtype: dictionary
+    :rtype: :class:`Config <helpers.Config>`
     """
 
     param_requirements = {'pickup_check_distance_trigger': (float, int),
@@ -77,4 +180,4 @@ def get_config():
             sys.exit('config file does not contain required parameter: {}'.format(param))
         if not isinstance(config[param], param_requirements[param]):
             sys.exit('Invalid value for parameter {}: {}'.format(param, config[param]))
-    return config
+    return Config(**{param: config[param] for param in param_requirements})
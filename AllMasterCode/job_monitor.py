@@ -2,20 +2,61 @@
 Contains implementation of the job monitor's run loop
 """
 
+import logging
 import sys
 import time
-from datetime import datetime
-from helpers import get_config, get_distance
+from concurrent.futures import ThreadPoolExecutor
+from helpers import get_config, get_sqdistance
 from models import Carry, Task
 from database import Database
 from logger import MonitorLog
 
+# adaptive polling bounds for the run loop: fast while location data
+# flows, backing off exponentially when the truck is idle
+MIN_POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 1.0
+# the deactivation probe is a separate query, so it only runs once
+# every this many loop iterations
+ACTIVE_CHECK_POLLS = 10
+# how long (in seconds) a has_active_alerts result stays valid in
+# check_job before the database is asked again
+ALERT_CHECK_TTL = 0.5
+
+# location-type flags, resolved once per loc row so the hot-path
+# checks are single integer mask tests instead of string compares
+FLAG_ITEM_CAPABLE = 1
+FLAG_STOW = 2
+FLAG_DOCK = 4
+
+# alert type names, interned so the repeated lookups and comparisons
+# against them resolve by pointer identity instead of character scans
+ALERT_CLAMPS_CLOSED_EVENT = sys.intern('clamps_closed_event')
+ALERT_CLAMPS_CLOSED_WARNING = sys.intern('clamps_closed_warning')
+ALERT_DROP_ITEMS = sys.intern('drop_items')
+ALERT_DROP_LOCATION = sys.intern('drop_location')
+ALERT_REMAINING_TASKS = sys.intern('remaining_tasks')
+
+# unknown types default to item-capable, matching the historical
+# "anything but aisles and the charging area" rule
+LOC_TYPE_FLAGS = {
+    'aisle': 0,
+    'charging': 0,
+    'stow': FLAG_ITEM_CAPABLE | FLAG_STOW,
+    'dock': FLAG_ITEM_CAPABLE | FLAG_DOCK,
+    'dockOS': FLAG_ITEM_CAPABLE | FLAG_DOCK,
+}
+
 
 class JobMonitor(object):
     """
     Monitors a given truck and job.
     """
 
+    # the NOE (not-otherwise-expected) location, geo feature '02TK149';
+    # becomes an admissible drop destination while 'Cannot_Place_Alert'
+    # or 'Damaged_Item' alerts are active
+    __NOE_loc = 79
+
     def __init__(self, job_id, truck_id, config=None):
         """
         Constructs a *Job Monitor* for the specified job and truck.
@@ -25,38 +66,78 @@ class JobMonitor(object):
         :param truck_id: The truck ID
         :type truck_id: int
         """
-        # get contents of config file
+        # the manager passes its already-parsed config; the fallback
+        # load is memoized, so the file is never parsed more than once
+        # per process
         self.config = config if config is not None else get_config()
+        # thresholds squared once here; event_distance_check compares
+        # squared distances, so the per-row multiply goes away
+        self._drop_thr_sq = self.config.drop_check_distance ** 2
+        self._pickup_thr_sq = self.config.pickup_check_distance_trigger ** 2
         # create the db
         self.db_connection = Database(job_id, truck_id, self.config)
-        # short now time func
-        self.now = lambda: str(datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S'))
+        # cache for now(): the formatted string only changes once per
+        # second, so it is rebuilt at most once per wall-clock tick
+        self.__now_tick = 0
+        self.__now_str = None
         # create logger
         self.log = MonitorLog(job_id, truck_id, 'info', 'JM')
         # current location data, gotten from loc_data table
         self.curr_loc_id = None
         self.curr_loc_type = None
+        self.curr_loc_flags = 0
         self.curr_loc_time = None
         self.curr_loc_coords = None
         self.prev_loc_time = None
+        # float epoch twins of the timestamps above, derived from the
+        # datetime the connector already parsed; per-tick deltas are
+        # plain FP subtractions with no string parsing
+        self.curr_loc_ts = None
+        self.prev_loc_ts = None
         self.pickup_check = False
         # store correct possible origins and destinations
         # which are location ids extracted from tasks
-        self.correct_origins = []
-        self.correct_dests = []
-        self.pickup_history = []
+        self.correct_origins = set()
+        self.correct_dests = set()
+        self.pickup_history = set()
+        # drop history keeps insertion order: check_drop consumes the
+        # most recent drop location
         self.drop_history = []
         self.latest_pickup_item_ids = []
         # store tasks
         self.tasks = []
         self.task_completion_times = []
-        self.speed_accumulator = []
+        # (monotonic timestamp, result) of the last active-alert probe;
+        # create_alert overwrites it so a fresh alert is never missed
+        self._alert_probe = (0.0, False)
+        # running sum and count replace the old per-sample speed list:
+        # the task average needs nothing else, and the reset is O(1)
+        self._speed_sum = 0.0
+        self._speed_count = 0
         # store carries
         self.carries = []
         self.job_start_time = self.now()
         self.previous_clamp_status = 0
         self.set_tasks()
 
+    def now(self):
+        """
+        Returns the current wall-clock time as a
+        *'%Y-%m-%d %H:%M:%S'* string.
+
+        The string only changes once per second, so it is cached per
+        integer :func:`time.time` tick instead of being reformatted on
+        every call.
+
+        :returns: The current timestamp.
+        :rtype: str
+        """
+        tick = int(time.time())
+        if tick != self.__now_tick:
+            self.__now_tick = tick
+            self.__now_str = time.strftime('%Y-%m-%d %H:%M:%S')
+        return self.__now_str
+
     def run(self):
         """
         The *Job Monitor*'s main run loop.
@@ -73,7 +154,19 @@ class JobMonitor(object):
           include the logic that checks task completion and carry/trip
           finalization.
 
+        Location batches are prefetched on a single worker thread, so
+        the next query's round-trip overlaps with the processing of the
+        current batch. The fetch is safe off-thread because
+        :func:`get_loc_data <database.Database.get_loc_data>` runs on
+        its own pooled connection.
+
         """
+
+        def fetch_batch(start_time):
+            # materialized in the worker so the DB round-trip happens
+            # there, not on first iteration in the processing thread
+            return list(self.db_connection.get_loc_data(start_time))
+
         curr_pickup_coords = None
         curr_pickup_time = None
         curr_drop_coords = None
@@ -81,62 +174,105 @@ class JobMonitor(object):
         loc_data_start_time = self.job_start_time
         drop_check = False
         active_pickup_event = False
-        while True:
-            time.sleep(0.2)
-            # for manual job deactivation through the database
-            self.is_job_active()
-            loc_data = self.db_connection.get_loc_data(loc_data_start_time)
-            for loc in loc_data:
-                self.set_loc_data(loc)
-                if not self.carries:
-                    self.carries.append(Carry(1, self.curr_loc_time, self.curr_loc_id))
-                self.update_carry_times()
-                self.carries[-1].trips[-1].append_speed(loc['speed'])
-                self.carries[-1].trips[-1].append_coords(self.curr_loc_coords)
-                current_clamp_status = loc['clamp_status']
-                drop_signal = True if not self.previous_clamp_status & 0x40 and current_clamp_status & 0x40 else False
-                pickup_signal = True if self.previous_clamp_status & 0x80 and not current_clamp_status & 0x80 else False
-                self.previous_clamp_status = current_clamp_status
-
-                if pickup_signal:
-                    self.log.info('\n- PICKUP @ {} at {}'.format(self.curr_loc_id, self.curr_loc_coords))
-                    if self.clamp_check_enabled():
-                        self.pickup_history.append(self.curr_loc_id)
-                        clamp_warning_name = 'clamps_closed_event' if self.curr_loc_id in self.correct_origins else 'clamps_closed_warning'
-                        if self.has_active_tasks() and self.curr_loc_id not in self.correct_dests:
-                            self.create_alert(clamp_warning_name, self.curr_loc_id)
-                        self.log.info('Initializing pickup distance check')
-                        self.pickup_check = True
-                        curr_pickup_coords = self.curr_loc_coords
-                        curr_pickup_time = self.curr_loc_time
-                        if self.curr_loc_id in self.correct_origins:
-                            active_pickup_event = True
-                            self.db_connection.cancel_alerts('clamps_closed_warning')
-                            self.finalize_trip(self.curr_loc_id, self.curr_loc_time, False)
-
-                if drop_signal:
-                    self.log.info('\n- DROP @ {} at {}'.format(self.curr_loc_id, self.curr_loc_coords))
-                    if self.clamp_check_enabled() and not drop_check:
-                        self.check_pickup(curr_pickup_coords, curr_pickup_time)
-                        self.drop_history.append(self.curr_loc_id)
-                        self.log.info('Initializing drop distance check')
-                        drop_check = True
-                        curr_drop_coords = self.curr_loc_coords
-                        curr_drop_time = self.curr_loc_time
-                        if self.curr_loc_id in self.correct_dests:
-                            self.db_connection.cancel_alerts('clamps_closed_warning')
-
-                if drop_check and self.event_distance_check(self.config['drop_check_distance'], curr_drop_coords):
-                    drop_check = False
-                    sensed_items = self.db_connection.get_drop_data(curr_drop_time, self.curr_loc_time)
-                    self.check_drop(self.drop_history[-1], sensed_items)
-
-                if active_pickup_event and self.event_distance_check(self.config['pickup_check_distance_trigger'], curr_pickup_coords):
-                    active_pickup_event = False
-                    self.db_connection.cancel_alerts('clamps_closed_event')
-
-            if loc_data:
-                loc_data_start_time = self.curr_loc_time
+        poll_interval = MIN_POLL_INTERVAL
+        poll_count = 0
+        # bind the per-row callables and hot collections once; inside
+        # the batch loop each would otherwise cost a fresh attribute
+        # lookup per location row. check_job clears (never rebinds)
+        # the two sets, so the locals stay valid for the job's life
+        set_loc_data = self.set_loc_data
+        update_carry_times = self.update_carry_times
+        db = self.db_connection
+        correct_origins = self.correct_origins
+        correct_dests = self.correct_dests
+        log_info = self.log.info
+        prefetch_pool = ThreadPoolExecutor(max_workers=1)
+        # the monitor leaves this loop via sys.exit() in is_job_active;
+        # the finally clause stops the prefetch worker so long-lived
+        # prefork processes do not accumulate one thread per job
+        try:
+            next_batch = prefetch_pool.submit(fetch_batch, loc_data_start_time)
+            while True:
+                time.sleep(poll_interval)
+                poll_count += 1
+                # for manual job deactivation through the database; probed
+                # every few polls so deactivation latency stays bounded
+                # without a dedicated query per iteration
+                if poll_count % ACTIVE_CHECK_POLLS == 0:
+                    self.is_job_active()
+                loc_data = next_batch.result()
+                if loc_data:
+                    loc_data_start_time = loc_data[-1]['timestamp'].isoformat(
+                        sep=' ', timespec='microseconds')
+                # kick the next fetch off before processing this batch
+                next_batch = prefetch_pool.submit(fetch_batch, loc_data_start_time)
+                for loc in loc_data:
+                    set_loc_data(loc)
+                    if not self.carries:
+                        self.carries.append(Carry(1, self.curr_loc_time, self.curr_loc_id))
+                    update_carry_times()
+                    # bind the open trip once; the chained [-1][-1] lookups
+                    # would otherwise re-resolve for every accumulator call
+                    current_trip = self.carries[-1].trips[-1]
+                    current_trip.append_speed(loc['speed'])
+                    current_trip.append_coords(self.curr_loc_coords)
+                    current_clamp_status = loc['clamp_status']
+                    # edge detection via XOR: rising 0x40 arms the drop
+                    # check, falling 0x80 arms the pickup check
+                    changed = self.previous_clamp_status ^ current_clamp_status
+                    drop_signal = changed & current_clamp_status & 0x40
+                    pickup_signal = changed & self.previous_clamp_status & 0x80
+                    self.previous_clamp_status = current_clamp_status
+
+                    if pickup_signal:
+                        log_info('\n- PICKUP @ %s at %s', self.curr_loc_id, self.curr_loc_coords)
+                        if self.clamp_check_enabled():
+                            self.pickup_history.add(self.curr_loc_id)
+                            clamp_warning_name = ALERT_CLAMPS_CLOSED_EVENT if self.curr_loc_id in correct_origins else ALERT_CLAMPS_CLOSED_WARNING
+                            if self.has_active_tasks() and self.curr_loc_id not in correct_dests:
+                                self.create_alert(clamp_warning_name, self.curr_loc_id)
+                            log_info('Initializing pickup distance check')
+                            self.pickup_check = True
+                            curr_pickup_coords = self.curr_loc_coords
+                            curr_pickup_time = self.curr_loc_time
+                            if self.curr_loc_id in correct_origins:
+                                active_pickup_event = True
+                                db.cancel_alerts(ALERT_CLAMPS_CLOSED_WARNING)
+                                self.finalize_trip(self.curr_loc_id, self.curr_loc_time, False)
+
+                    if drop_signal:
+                        log_info('\n- DROP @ %s at %s', self.curr_loc_id, self.curr_loc_coords)
+                        if self.clamp_check_enabled() and not drop_check:
+                            self.check_pickup(curr_pickup_coords, curr_pickup_time)
+                            self.drop_history.append(self.curr_loc_id)
+                            log_info('Initializing drop distance check')
+                            drop_check = True
+                            curr_drop_coords = self.curr_loc_coords
+                            curr_drop_time = self.curr_loc_time
+                            # one query covers both NOE-enabling alert types
+                            if JobMonitor.__NOE_loc not in correct_dests \
+                                    and db.has_noe_alerts():
+                                correct_dests.add(JobMonitor.__NOE_loc)
+                            if self.curr_loc_id in correct_dests:
+                                db.cancel_alerts(ALERT_CLAMPS_CLOSED_WARNING)
+
+                    if drop_check and self.event_distance_check(self._drop_thr_sq, curr_drop_coords):
+                        drop_check = False
+                        sensed_items = db.get_drop_data(curr_drop_time, self.curr_loc_time)
+                        self.check_drop(self.drop_history[-1], sensed_items)
+
+                    if active_pickup_event and self.event_distance_check(self._pickup_thr_sq, curr_pickup_coords):
+                        active_pickup_event = False
+                        db.cancel_alerts(ALERT_CLAMPS_CLOSED_EVENT)
+
+                if loc_data:
+                    poll_interval = MIN_POLL_INTERVAL
+                else:
+                    poll_interval = min(poll_interval * 1.5, MAX_POLL_INTERVAL)
+        finally:
+            # lets the in-flight fetch finish on its own thread and
+            # then retires it
+            prefetch_pool.shutdown(wait=False)
 
     def clamp_check_enabled(self):
         """
@@ -150,7 +286,7 @@ class JobMonitor(object):
                   *False* otherwise.
         :rtype: bool
         """
-        return self.curr_loc_type != 'aisle' and self.curr_loc_type != 'charging'
+        return bool(self.curr_loc_flags & FLAG_ITEM_CAPABLE)
 
     def update_carry_times(self):
         """
@@ -161,14 +297,18 @@ class JobMonitor(object):
         difference between this location's timestamp and the
         previous timestamp.
         """
-        if self.prev_loc_time is None:
+        # common case (aisle/charging) exits on the first test
+        if self.prev_loc_time is None or not self.curr_loc_flags & (FLAG_STOW | FLAG_DOCK):
             return
-        if self.curr_loc_type == 'stow':
-            self.carries[-1].add_stow_time(self.prev_loc_time, self.curr_loc_time)
-        elif self.curr_loc_type == 'dock' or self.curr_loc_type == 'dockOS':
-            self.carries[-1].add_dock_time(self.prev_loc_time, self.curr_loc_time)
+        # the epoch twins make the delta one subtraction, with no
+        # parsing inside the accumulators
+        delta_seconds = self.curr_loc_ts - self.prev_loc_ts
+        if self.curr_loc_flags & FLAG_STOW:
+            self.carries[-1].add_stow_time(delta_seconds)
+        else:
+            self.carries[-1].add_dock_time(delta_seconds)
 
-    def should_check_item_at_drop(self, item):
+    def should_check_item_at_drop(self, item, dl_alert_origins):
         """
         Returns whether items from the specified location
         should be processed or discarded at drop time.
@@ -180,19 +320,23 @@ class JobMonitor(object):
         Items at drop time are ignored if:
 
         - Their origin is not in the correct origins and has
-          active 'drop_location' alerts. This policy is useful
+          active ALERT_DROP_LOCATION alerts. This policy is useful
           to avoid false positives from neighboring stows in case
           the driver is fixing an alert.
         - Their origin does not belong to the pickup history.
 
         :param item: The item to check.
         :type item: dict
+        :param dl_alert_origins: The origins with active *drop_location*
+            alerts, pre-fetched in bulk by
+            :func:`check_drop <job_monitor.JobMonitor.check_drop>`.
+        :type dl_alert_origins: set
         """
         if item['id'] in self.latest_pickup_item_ids:
             return True
 
         item_origin = item['item_origin']
-        if item_origin not in self.correct_origins and self.db_connection.loc_has_active_dl_alerts(item_origin):
+        if item_origin not in self.correct_origins and item_origin in dl_alert_origins:
             return False
 
         return True if item_origin in self.pickup_history else False
@@ -216,8 +360,7 @@ class JobMonitor(object):
         self.log.info('checking pickup load')
         pickup_data = []
 
-        pickup_trigger_distance = self.config['pickup_check_distance_trigger']
-        if self.pickup_check and self.event_distance_check(pickup_trigger_distance, curr_pickup_coords):
+        if self.pickup_check and self.event_distance_check(self._pickup_thr_sq, curr_pickup_coords):
             pickup_data = self.db_connection.get_pickup_data(curr_pickup_coords, curr_pickup_time)
 
         self.pickup_check = False
@@ -291,7 +434,10 @@ class JobMonitor(object):
             wrong_items.append(item)
             return
 
-        model_tasks = [t for t in self.tasks if t.model == item['model']]
+        # the model index replaces a scan of the whole task list; the
+        # correction path needs complete tasks too, so it cannot use
+        # the open-task indexes
+        model_tasks = self._tasks_by_model.get(item['model'], ())
 
         task_completed_by_item = None
         for task in model_tasks:
@@ -330,6 +476,7 @@ class JobMonitor(object):
         if correction_task is not None:
             correction_task.item_id = item['id']
             correction_task.complete = True
+            self.__remove_open_task(correction_task)
             self.db_connection.save_task(correction_task)
             correct_items.append(item)
         else:
@@ -390,54 +537,84 @@ class JobMonitor(object):
         correct_items = []
         wrong_items = []
         returned_items = []
+        item_loc_updates = []
 
         self.log.info('Pickup set: {}'.format(self.latest_pickup_item_ids))
         self.log.info('Sensed items at drop: {}'.format(sensed_items))
 
+        # one query flags every origin with active drop-location
+        # alerts, instead of one query per sensed item
+        dl_alert_origins = self.db_connection.get_dl_alert_origins(
+            {item['item_origin'] for item in sensed_items})
+
         for item in sensed_items:
             item_origin = item['item_origin']
-            if not self.should_check_item_at_drop(item):
+            if not self.should_check_item_at_drop(item, dl_alert_origins):
                 continue
-            tasks_to_check = [t for t in self.tasks if not t.complete]
-            for task in tasks_to_check:
-                if item['model'] == task.model and item['serial_lock'] == 0 and item_origin == task.origin and drop_location == task.dest:
-                    # set the tasks item id to be that of the correctly validated item
-                    self.db_connection.save_item_loc(item, drop_location)
-                    self.finalize_task(task, item)
-                    self.db_connection.save_task(task)
-                    correct_items.append(item)
-                    break
+            matched_task = None
+            if item['serial_lock'] == 0:
+                # an exact (model, origin, dest) hit wins; at the NOE
+                # location any open task on model and origin may close
+                # while the enabling alerts are active
+                candidates = self._open_tasks_by_key.get(
+                    (item['model'], item_origin, drop_location))
+                if candidates:
+                    matched_task = candidates[0]
+                elif drop_location == JobMonitor.__NOE_loc:
+                    noe_candidates = self._open_tasks_by_model_origin.get(
+                        (item['model'], item_origin))
+                    if noe_candidates:
+                        matched_task = noe_candidates[0]
+                        self.log.info('Finalising the NOE location drop for model {}'.format(matched_task.model))
+            if matched_task is not None:
+                # set the tasks item id to be that of the correctly validated item
+                item_loc_updates.append((drop_location, item['id']))
+                self.finalize_task(matched_task, item)
+                self.db_connection.save_task(matched_task)
+                correct_items.append(item)
+            elif item_origin != drop_location:
+                self.check_alleged_wrong_item(item, drop_location, correct_items, returned_items, wrong_items)
             else:
-                if item_origin != drop_location:
-                    self.check_alleged_wrong_item(item, drop_location, correct_items, returned_items, wrong_items)
-                else:
-                    returned_items.append(item)
+                returned_items.append(item)
 
+        # flush all location updates accumulated above in one statement
+        self.db_connection.save_item_locs(item_loc_updates)
+
+        # the incomplete task list is built once; per wrong item the loop
+        # skips already-claimed tasks instead of rebuilding a sub-list
         incomplete_tasks = [t for t in self.tasks if not t.complete]
-        checked_tasks = []
+        # a set keeps the claimed-task membership test O(1) as the
+        # wrong-item count grows
+        checked_tasks = set()
         for wrong_item in wrong_items:
-            tasks_to_check = [t for t in incomplete_tasks if t.task_id not in checked_tasks]
-            for task in tasks_to_check:
+            for task in incomplete_tasks:
+                if task.task_id in checked_tasks:
+                    continue
                 if wrong_item['model'] == task.model and wrong_item['serial_lock'] == 0 and wrong_item['item_origin'] == task.origin:
                     wrong_item['correct_loc_id'] = task.dest
-                    checked_tasks.append(task.task_id)
+                    checked_tasks.add(task.task_id)
                     break
             else:
                 wrong_item['correct_loc_id'] = wrong_item['item_origin']
 
-        if correct_items and drop_location in self.correct_dests:
-            self.speed_accumulator = []
+        # correct_dests is not mutated below, so the membership test is
+        # evaluated once and shared by the three checks that need it
+        is_correct_dest = drop_location in self.correct_dests
+
+        if correct_items and is_correct_dest:
+            self._speed_sum = 0.0
+            self._speed_count = 0
             self.task_completion_times.append(self.curr_loc_time)
 
         if returned_items:
             self.db_connection.cancel_item_alerts(returned_items)
 
         if wrong_items:
-            alert_type = 'drop_items' if drop_location in self.correct_dests else 'drop_location'
-            self.log.info('wrong items in drop location {}: {}'.format(drop_location, wrong_items))
+            alert_type = ALERT_DROP_ITEMS if is_correct_dest else ALERT_DROP_LOCATION
+            self.log.info('wrong items in drop location %s: %s', drop_location, wrong_items)
             self.create_alert(alert_type, drop_location, wrong_items)
 
-        if (correct_items or wrong_items or returned_items) and drop_location in self.correct_dests:
+        if (correct_items or wrong_items or returned_items) and is_correct_dest:
             self.finalize_trip(drop_location, self.curr_loc_time, True if correct_items else False)
 
         # only create a new carry if there were correct items in the drop
@@ -472,7 +649,8 @@ class JobMonitor(object):
         if self.carries[-1].trips[-1].origin == location and not carry_finished:
             return
 
-        self.carries[-1].trips[-1].finished(location, event_time)
+        # folds the trip's totals into the carry as it closes
+        self.carries[-1].finish_trip(location, event_time)
         if self.has_active_tasks() and not carry_finished:
             self.carries[-1].append_trip(event_time, location)
 
@@ -509,6 +687,27 @@ class JobMonitor(object):
         task.finish_time = self.curr_loc_time
         task.avg_speed = self.get_task_avg_speed()
         task.complete = True
+        self.__remove_open_task(task)
+
+    def __remove_open_task(self, task):
+        """
+        Removes a newly-completed task from the open-task indexes.
+
+        This must be invoked everywhere a task's *complete* flag
+        transitions to *True*, so the indexes only ever hold open
+        tasks.
+
+        :param task: The completed task.
+        :type task: :class:`Task <models.Task>`
+        """
+        key = (task.model, task.origin, task.dest)
+        for index, index_key in ((self._open_tasks_by_key, key),
+                                 (self._open_tasks_by_model_origin, key[:2]),
+                                 (self._open_tasks_by_dest, task.dest)):
+            candidates = index.get(index_key)
+            if candidates and task in candidates:
+                candidates.remove(task)
+        self._open_task_count -= 1
 
     def check_remaining_tasks(self, drop_location):
         """
@@ -526,38 +725,41 @@ class JobMonitor(object):
         :param drop_location: The location to check.
         :type drop_location: id
         """
-        incomplete_tasks = []
-        for task in self.tasks:
-            if not task.complete and task.dest == drop_location:
-                incomplete_tasks.append(task)
+        incomplete_tasks = self._open_tasks_by_dest.get(drop_location)
         if incomplete_tasks:
             # alert type (5) Missing items at drop location
-            self.create_alert('remaining_tasks', drop_location)
+            self.create_alert(ALERT_REMAINING_TASKS, drop_location)
             self.log.info('{} incomplete tasks'.format(len(incomplete_tasks)))
         else:
             self.db_connection.cancel_remaining_tasks_alert(drop_location)
 
-    def event_distance_check(self, threshold, clamp_event_coords):
+    def event_distance_check(self, threshold_sq, clamp_event_coords):
         """
         Checks whether the distance between the current coordinates
-        and the specified one is greater than the specified threshold.
+        and the specified one is greater than the configured threshold.
 
         This is invoked to monitor when the truck drives away from the
         pickup or drop coordinates, to trigger the pickup and drop
         checks at the proper time.
 
-        :param threshold: The distance threshold.
-        :type threshold: float
+        The comparison runs on squared distances through the compiled
+        :func:`get_sqdistance <helpers.get_sqdistance>` kernel against
+        a threshold squared once at construction, so the per-row cost
+        while a check is armed is a handful of arithmetic ops with no
+        square root.
+
+        :param threshold_sq: The squared distance threshold.
+        :type threshold_sq: float
         :param clamp_event_coords: The reference coordinates.
         :type clamp_event_coords: dict
         :return: *True* if the distance is greater than the threshold,
                  *False* otherwise.
         :rtype: bool
         """
-        distance = get_distance(self.curr_loc_coords, clamp_event_coords)
-        if distance > threshold:
-            return True
-        return False
+        coords = self.curr_loc_coords
+        sqdistance = get_sqdistance(coords['x'], coords['y'],
+                                    clamp_event_coords['x'], clamp_event_coords['y'])
+        return sqdistance > threshold_sq
 
     def create_alert(self, alert_type, loc_id, wrong_items=None):
         """
@@ -572,7 +774,9 @@ class JobMonitor(object):
         :type wrong_items: list or None
         """
         self.db_connection.create_alert(loc_id, alert_type, wrong_items, self.curr_loc_time)
-        self.log.info('{} alert created at {}'.format(alert_type, loc_id))
+        # the new alert is live: refresh the check_job probe cache
+        self._alert_probe = (time.monotonic(), True)
+        self.log.info('%s alert created at %s', alert_type, loc_id)
 
     def get_task_avg_speed(self):
         """
@@ -581,10 +785,11 @@ class JobMonitor(object):
         :return: The average speed, or *0* if it could not be determined.
         :rtype: number
         """
-        if not self.speed_accumulator:
+        if not self._speed_count:
             return 0
 
-        return round(sum(self.speed_accumulator) / len(self.speed_accumulator), 2)
+        # same fixed-point rounding as Trip.finished
+        return int(self._speed_sum / self._speed_count * 100 + 0.5) / 100
 
     def set_tasks(self):
         """
@@ -593,15 +798,30 @@ class JobMonitor(object):
         This invoked by
         :func:`__init__ <job_monitor.JobMonitor.__init__>`.
         """
+        # open-task indexes so the drop path looks up candidate tasks
+        # by key instead of scanning the whole task list per item
+        self._open_tasks_by_key = {}
+        self._open_tasks_by_model_origin = {}
+        self._open_tasks_by_dest = {}
+        # all tasks (open and complete) by model, for the wrong-item
+        # correction path which looks at both
+        self._tasks_by_model = {}
         tasks = self.db_connection.get_task_data()
+        self._open_task_count = len(tasks)
         for task in tasks:
-            self.correct_origins.append(task['origin'])
-            self.correct_dests.append(task['dest'])
-            self.tasks.append(
-                Task(task['id'],
-                     task['model'],
-                     task['origin'],
-                     task['dest']))
+            self.correct_origins.add(task['origin'])
+            self.correct_dests.add(task['dest'])
+            task_entry = Task(task['id'],
+                              task['model'],
+                              task['origin'],
+                              task['dest'])
+            self.tasks.append(task_entry)
+            self._open_tasks_by_key.setdefault(
+                (task['model'], task['origin'], task['dest']), []).append(task_entry)
+            self._open_tasks_by_model_origin.setdefault(
+                (task['model'], task['origin']), []).append(task_entry)
+            self._open_tasks_by_dest.setdefault(task['dest'], []).append(task_entry)
+            self._tasks_by_model.setdefault(task['model'], []).append(task_entry)
         self.log.info(self.tasks)
 
     def set_loc_data(self, loc):
@@ -620,11 +840,20 @@ class JobMonitor(object):
         :type loc: dict
         """
         self.prev_loc_time = self.curr_loc_time
+        self.prev_loc_ts = self.curr_loc_ts
         self.curr_loc_type = loc['type']
+        self.curr_loc_flags = LOC_TYPE_FLAGS.get(loc['type'], FLAG_ITEM_CAPABLE)
         self.curr_loc_id = loc['geo_feature_id']
-        self.curr_loc_time = loc['timestamp'].strftime('%Y-%m-%d %H:%M:%S.%f')
+        timestamp = loc['timestamp']
+        # isoformat matches the '%Y-%m-%d %H:%M:%S.%f' layout and skips
+        # the libc format machinery strftime goes through per row
+        self.curr_loc_time = timestamp.isoformat(sep=' ', timespec='microseconds')
+        # the connector already parsed the datetime, so the float twin
+        # costs one method call and no parsing
+        self.curr_loc_ts = timestamp.timestamp()
         self.curr_loc_coords = {'x': loc['x'], 'y': loc['y']}
-        self.speed_accumulator.append(loc['speed'])
+        self._speed_sum += loc['speed']
+        self._speed_count += 1
 
     def is_job_active(self):
         """
@@ -644,14 +873,14 @@ class JobMonitor(object):
         """
         Returns whether there are active (incomplete) tasks.
 
+        The count is maintained incrementally as tasks complete, so
+        this frequent check never walks the task list.
+
         :returns: *True* if at least one not complete task exists,
                   *False* otherwise.
         :rtype: bool
         """
-        for task in self.tasks:
-            if not task.complete:
-                return True
-        return False
+        return self._open_task_count > 0
 
     def check_job(self):
         """
@@ -672,31 +901,64 @@ class JobMonitor(object):
         a new job is launched; then it will be terminated by the
         *Job Manager* before starting a new *Job Monitor*.
         """
-        if not self.tasks or self.has_active_tasks() or self.db_connection.has_active_alerts():
+        # the two local checks short-circuit before any database work
+        if not self.tasks or self.has_active_tasks():
+            return
+        probe_time = time.monotonic()
+        checked_at, had_alerts = self._alert_probe
+        if probe_time - checked_at > ALERT_CHECK_TTL:
+            had_alerts = self.db_connection.has_active_alerts()
+            self._alert_probe = (probe_time, had_alerts)
+        if had_alerts:
             return
 
         self.log.info('\njob completed at: {}\n'.format(self.now()))
         self.__log_all_data()
-        self.db_connection.save_carries(self.carries)
-        self.db_connection.save_job(self.job_start_time, self.now(), self.carries)
+        self.db_connection.save_job_and_carries(self.job_start_time, self.now(), self.carries)
+        # the rows were materialized above, so the trip objects can be
+        # recycled and the carries released; the monitor keeps running
+        # until the manager deactivates the job, and anything moved
+        # from here on only produces alerts
+        for carry in self.carries:
+            carry.retire_trips()
+        self.carries = []
         self.tasks = []
-        self.correct_origins = []
-        self.correct_dests = []
+        # the lookup indexes must empty together with the task list:
+        # a stale _tasks_by_model entry would route post-completion
+        # drops through check_alleged_wrong_item against retired tasks
+        self._tasks_by_model.clear()
+        self._open_tasks_by_key.clear()
+        self._open_tasks_by_model_origin.clear()
+        self._open_tasks_by_dest.clear()
+        # cleared in place: run() holds local bindings to these sets
+        self.correct_origins.clear()
+        self.correct_dests.clear()
 
     def __log_all_data(self):
         """
         Logs all job data when the job is completed.
+
+        The whole dump is assembled in memory and emitted as a single
+        record, so the logging pipeline (lock, handler dispatch, write)
+        runs once instead of once per attribute per object.
         """
-        self.log.info('\n\n:::::: TASKS ::::::')
+        # diagnostic-only volume: production (info-level) runs skip
+        # the whole dump, including the attribute introspection
+        if not self.log.isEnabledFor(logging.DEBUG):
+            return
+        # the models are slotted, so the dump walks __slots__ instead
+        # of a per-instance __dict__
+        lines = ['\n\n:::::: TASKS ::::::']
         for task in self.tasks:
-            self.log.info('\n')
-            for key, value in vars(task).items():
-                self.log.info('{}: {}'.format(key, value))
-        self.log.info('\n\n:::::: CARRIES ::::::')
+            lines.append('')
+            lines.extend('{}: {}'.format(key, getattr(task, key))
+                         for key in task.__slots__)
+        lines.append('\n\n:::::: CARRIES ::::::')
         for carry in self.carries:
-            self.log.info('\n')
-            for key, value in vars(carry).items():
-                self.log.info('{}: {}'.format(key, value))
+            lines.append('')
+            lines.extend('{}: {}'.format(key, getattr(carry, key))
+                         for key in carry.__slots__)
+        self.log.debug('\n'.join(lines))
 
 
 if __name__ == '__main__':
@@ -716,3 +978,4 @@ if __name__ == '__main__':
         JOB_MONITOR.log.info('\nan error in job {} has occured: {}\n\n{}'.format(JOB_ID, exception, TRACE_BACK))
     finally:
         JOB_MONITOR.db_connection.close_db()
+        JOB_MONITOR.log.close()
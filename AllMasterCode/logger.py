@@ -3,9 +3,50 @@ This module contains the implementation of logging facilities
 for the events produced by the *Job Manager* and *Job Monitors*.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 
+# log records are buffered up to this many bytes before hitting the
+# kernel, collapsing many small write() syscalls into few large ones
+LOG_BUFFER_SIZE = 65536
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    A :class:`logging.FileHandler` that writes through an explicit
+    large buffer and skips the per-record flush.
+
+    The buffer drains when it fills and when the handler is closed;
+    the loggers below register the close with :mod:`atexit` so no
+    records are lost on shutdown.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode,
+                    buffering=LOG_BUFFER_SIZE, encoding=self.encoding)
+
+    def flush(self):
+        """
+        Skips the flush the base class performs after every record;
+        the buffered stream flushes itself when full and on close.
+        """
+
+
+class _PlainFormatter(logging.Formatter):
+    """
+    Returns the record message verbatim.
+
+    The monitor format is *%(message)s* only, so the default
+    formatter's exc_info checks, time handling and style machinery
+    are pure overhead per record.
+    """
+
+    def format(self, record):
+        return record.getMessage()
+
 
 class MonitorLog(object):
     """
@@ -26,41 +67,120 @@ class MonitorLog(object):
         :param prefix: The log file name prefix (either *JM* or *DB*).
         :type prefix: str
         """
-        log_date = str(datetime.strftime(datetime.now(), '%y%m%d_%H%M%S'))
+        # __format__ goes straight to the C formatting path and is
+        # already a string, so no strftime call or str() wrap is needed
+        log_date = '{:%y%m%d_%H%M%S}'.format(datetime.now())
         if level == 'debug':
             log_level = logging.DEBUG
         else:
             log_level = logging.INFO
         self.logger = logging.getLogger('logger_{}_{}'.format(job_id, prefix))
-        log_format = "%(message)s"
-        logging.basicConfig(format=log_format, level=log_level)
-        # file handler
-        file_handler = logging.FileHandler('logs/{}_{}_T{}_J{}.log'.format(prefix,
-                                                                           log_date,
-                                                                           truck_id,
-                                                                           job_id))
-        file_handler.setLevel(log_level)
-        formatter = logging.Formatter(log_format)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-
-    def info(self, message):
+        # no basicConfig: it would install a root stderr handler that
+        # every record would also have to pay for. The level is set on
+        # this logger directly and propagation stays off
+        self.logger.setLevel(log_level)
+        self.logger.propagate = False
+        # set when this instance owns the listener thread and handler;
+        # close() releases them so long-lived worker processes do not
+        # accumulate one thread per job served
+        self.__listener = None
+        self.__file_handler = None
+        # addHandler is not idempotent: constructing a second logger
+        # for the same (job, prefix) pair would stack handlers and
+        # multiply every record's writes
+        if not self.logger.handlers:
+            # delay=True postpones opening the file until the first
+            # record
+            file_handler = _BufferedFileHandler('logs/{}_{}_T{}_J{}.log'.format(prefix,
+                                                                                log_date,
+                                                                                truck_id,
+                                                                                job_id),
+                                                delay=True)
+            file_handler.setLevel(log_level)
+            file_handler.setFormatter(_PlainFormatter())
+            # the logger only puts records on a queue; a listener
+            # thread owns the file handler, so hot-path log calls
+            # never block on disk writes
+            log_queue = queue.Queue(-1)
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            listener = logging.handlers.QueueListener(
+                log_queue, file_handler, respect_handler_level=True)
+            listener.start()
+            # atexit runs these LIFO: the listener stops (draining its
+            # queue) before the handler closes and flushes its buffer.
+            # This is the fallback for processes that never reach
+            # close(), e.g. a monitor killed mid-run
+            atexit.register(file_handler.close)
+            atexit.register(listener.stop)
+            self.__listener = listener
+            self.__file_handler = file_handler
+
+    def close(self):
+        """
+        Stops the listener thread, flushes and closes the log file and
+        releases the named logger's handlers.
+
+        Monitors run inside long-lived prefork workers, so shutdown
+        must release these per-job resources explicitly; the
+        :mod:`atexit` hooks only cover process exit. Releasing the
+        handlers also lets a later logger for the same job start
+        cleanly instead of finding the stale ones.
+        """
+        if self.__listener is None:
+            return
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        atexit.unregister(self.__listener.stop)
+        atexit.unregister(self.__file_handler.close)
+        self.__listener.stop()
+        self.__file_handler.close()
+        self.__listener = None
+        self.__file_handler = None
+
+    def isEnabledFor(self, level):
+        """
+        Returns whether the underlying logger processes records
+        of the specified level.
+
+        Callers use this to skip building expensive messages
+        (e.g. full SQL statements) that would be discarded.
+
+        :param level: The logging level to check.
+        :type level: int
+        :rtype: bool
+        """
+        return self.logger.isEnabledFor(level)
+
+    def info(self, message, *args):
         """
         Logs the specified message at the *info* level.
 
-        :param message: The message to log.
+        :param message: The message to log. Extra arguments are
+            %-interpolated lazily by the logging machinery.
 
         """
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def debug(self, message):
+    def debug(self, message, *args):
         """
         Logs the specified message at the *debug* level.
 
-        :param message: The message to log.
+        :param message: The message to log. Extra arguments are
+            %-interpolated lazily by the logging machinery.
+
+        """
+        self.logger.debug(message, *args)
 
+    def exception(self, message, *args):
         """
-        self.logger.debug(message)
+        Logs the specified message at the *error* level together
+        with the traceback of the exception being handled.
+
+        :param message: The message to log. Extra arguments are
+            %-interpolated lazily by the logging machinery.
+
+        """
+        self.logger.exception(message, *args)
 
 
 class ManagerLog(object):
@@ -76,34 +196,62 @@ class ManagerLog(object):
         :param level: The logging level.
         :type level: str
         """
-        log_date = str(datetime.strftime(datetime.now(), '%y%m%d_%H%M%S'))
+        # __format__ goes straight to the C formatting path and is
+        # already a string, so no strftime call or str() wrap is needed
+        log_date = '{:%y%m%d_%H%M%S}'.format(datetime.now())
         if level == 'debug':
             log_level = logging.DEBUG
         else:
             log_level = logging.INFO
         self.logger = logging.getLogger('job_manager_log')
         log_format = "[%(asctime)s]: %(message)s"
-        logging.basicConfig(format=log_format, level=log_level)
-        file_handler = logging.FileHandler('logs/job_manager/{}.log'.format(log_date))
-        file_handler.setLevel(log_level)
-        formatter = logging.Formatter(log_format)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        # see MonitorLog: no root stderr handler, no propagation, and
+        # no handler stacking across repeated construction
+        self.logger.setLevel(log_level)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            file_handler = _BufferedFileHandler('logs/job_manager/{}.log'.format(log_date),
+                                                delay=True)
+            file_handler.setLevel(log_level)
+            formatter = logging.Formatter(log_format)
+            file_handler.setFormatter(formatter)
+            # as in MonitorLog, the file handler lives on a listener
+            # thread so request handlers never block on log writes
+            log_queue = queue.Queue(-1)
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            listener = logging.handlers.QueueListener(
+                log_queue, file_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(file_handler.close)
+            atexit.register(listener.stop)
 
-    def info(self, message):
+    def info(self, message, *args):
         """
         Logs the specified message at the *info* level.
 
-        :param message: The message to log.
+        :param message: The message to log. Extra arguments are
+            %-interpolated lazily by the logging machinery.
 
         """
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def debug(self, message):
+    def debug(self, message, *args):
         """
         Logs the specified message at the *debug* level.
 
-        :param message: The message to log.
+        :param message: The message to log. Extra arguments are
+            %-interpolated lazily by the logging machinery.
+
+        """
+        self.logger.debug(message, *args)
+
+    def exception(self, message, *args):
+        """
+        Logs the specified message at the *error* level together
+        with the traceback of the exception being handled.
+
+        :param message: The message to log. Extra arguments are
+            %-interpolated lazily by the logging machinery.
 
         """
-        self.logger.debug(message)
+        self.logger.exception(message, *args)
@@ -0,0 +1,12 @@
+-- Composite indexes covering the hot SELECT paths in database.py.
+--
+-- The alert checks (has_active_alerts, loc_has_active_dl_alerts,
+-- get_model_alerts) all filter on (job_id, active, type[, loc_id]);
+-- including id makes the index covering, so the checks resolve
+-- without touching the row data regardless of table size.
+CREATE INDEX alerts_job_active_type ON alerts (job_id, active, type, loc_id, id);
+
+-- get_loc_data and the pickup boundary search both filter on
+-- (truck_id, timestamp) and order by timestamp, turning the range
+-- scan into an index range read.
+CREATE INDEX loc_data_truck_ts ON loc_data (truck_id, timestamp);
@@ -0,0 +1,9 @@
+-- Composite indexes matching the job manager's hot queries.
+--
+-- get_job_truck, check_for_active_tasks and the job activation UPDATE
+-- all join through clamp_driver.clamp_id and filter jobs on
+-- (driver_id, active) and job_tasks on (job_id, status); these indexes
+-- turn each of them into an index seek instead of a table scan.
+CREATE INDEX idx_cd_clamp ON clamp_driver (clamp_id, id);
+CREATE INDEX idx_jobs_driver_active ON jobs (driver_id, active);
+CREATE INDEX idx_tasks_job_status ON job_tasks (job_id, status);
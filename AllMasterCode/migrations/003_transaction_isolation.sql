@@ -0,0 +1,7 @@
+-- Make READ COMMITTED the server default so connections no longer pay
+-- a SET SESSION round-trip on checkout. For restarts to keep the
+-- setting, add to my.cnf:
+--
+--     [mysqld]
+--     transaction-isolation = READ-COMMITTED
+SET GLOBAL TRANSACTION ISOLATION LEVEL READ COMMITTED;
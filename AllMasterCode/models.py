@@ -3,8 +3,12 @@ This module contains classes which implement the data models representing
 tasks, trips and carries.
 """
 
-from datetime import datetime
-from helpers import get_distance, get_time_delta
+from array import array
+from helpers import _distance, parse_timestamp
+
+# buffered coordinate samples are folded into the trip distance in
+# batches of this many points, amortizing the per-tick Python overhead
+COORD_BUFFER_SIZE = 64
 
 
 class Trip(object):
@@ -21,6 +25,12 @@ class Trip(object):
 
     """
 
+    # slots drop the per-instance __dict__: less memory per trip and
+    # attribute access through slot descriptors instead of a dict
+    __slots__ = ('carry_num', 'start_time', '_start_ts', 'finish_time',
+                 'origin', 'dest', 'travel_time', 'distance', 'avg_speed',
+                 '_speed_sum', '_speed_count', '_coord_xs', '_coord_ys')
+
     def __init__(self, carry_num, start_time, start_loc):
         """
         Constructs an open trip.
@@ -35,17 +45,29 @@ class Trip(object):
         """
         self.carry_num = carry_num
         self.start_time = start_time
+        # float epoch seconds: deltas become one FP subtraction; the
+        # string form is kept for the database and the logs
+        self._start_ts = parse_timestamp(start_time).timestamp()
         self.finish_time = None
         self.origin = start_loc
         self.dest = None
         self.travel_time = 0
         self.distance = 0
         self.avg_speed = 0
-        self.speeds = []
-        self.latest_coords = None
+        # a running sum and count are all the average needs; memory
+        # stays O(1) however long the trip runs
+        self._speed_sum = 0.0
+        self._speed_count = 0
+        # coordinates buffer as two C double arrays (structure of
+        # arrays): appends stay C-level and the distance folds in
+        # batches instead of per tick
+        self._coord_xs = array('d')
+        self._coord_ys = array('d')
 
     def __repr__(self):
-        return '[c{} {} to {}]'.format(self.carry_num, self.origin, self.dest)
+        # an f-string is compiled to bytecode, so no format-spec parse
+        # happens at call time (these run per trip per log dump)
+        return f'[c{self.carry_num} {self.origin} to {self.dest}]'
 
     def append_speed(self, speed):
         """
@@ -55,21 +77,51 @@ class Trip(object):
         :param speed: The speed in meters per second
         :type speed: float
         """
-        self.speeds.append(speed)
+        self._speed_sum += speed
+        self._speed_count += 1
 
     def append_coords(self, coords):
         """
-        Updates the driven distance, which is incremented by the distance
-        between the specified coordinates and the previous ones.
+        Records the latest coordinates.
+
+        The driven distance is not updated per call: samples buffer in
+        the coordinate arrays and their segments fold into the distance
+        once the buffer fills (and on finalization), amortizing the
+        per-tick cost down to two C-level appends.
 
         :param coords: The latest coordinates
         :type coords: dictionary
 
         """
-        if self.latest_coords:
-            self.distance += get_distance(self.latest_coords, coords)
+        self._coord_xs.append(coords['x'])
+        self._coord_ys.append(coords['y'])
+        if len(self._coord_xs) >= COORD_BUFFER_SIZE:
+            self.__flush_coords()
 
-        self.latest_coords = coords
+    def __flush_coords(self):
+        """
+        Folds the buffered coordinate segments into the driven
+        distance.
+
+        The last point stays in the buffer so the next flush continues
+        from it, keeping segment continuity across batches.
+        """
+        coord_xs = self._coord_xs
+        coord_ys = self._coord_ys
+        if len(coord_xs) < 2:
+            return
+        distance = self.distance
+        prev_x = coord_xs[0]
+        prev_y = coord_ys[0]
+        for index in range(1, len(coord_xs)):
+            curr_x = coord_xs[index]
+            curr_y = coord_ys[index]
+            distance += _distance(prev_x, prev_y, curr_x, curr_y)
+            prev_x = curr_x
+            prev_y = curr_y
+        self.distance = distance
+        del coord_xs[:-1]
+        del coord_ys[:-1]
 
     def finished(self, location, time):
         """
@@ -82,16 +134,16 @@ class Trip(object):
         :param time: The trip's end timestamp
         :type time: str
         """
-        if not self.speeds:
+        self.__flush_coords()
+        if not self._speed_count:
             self.avg_speed = 0
         else:
-            self.avg_speed = round(sum(self.speeds) / len(self.speeds), 2)
+            # fixed-point 2-decimal rounding; speeds are non-negative,
+            # so this matches round() without its quantization logic
+            self.avg_speed = int(self._speed_sum / self._speed_count * 100 + 0.5) / 100
 
         self.finish_time = time
-        f_time = datetime.strptime(self.finish_time, '%Y-%m-%d %H:%M:%S.%f')
-        s_time = datetime.strptime(self.start_time, '%Y-%m-%d %H:%M:%S.%f')
-        diff = f_time - s_time
-        self.travel_time = diff.total_seconds()
+        self.travel_time = parse_timestamp(time).timestamp() - self._start_ts
         self.dest = location
 
 
@@ -104,6 +156,16 @@ class Carry(object):
     first carry) to the completion of a task, which closes the ongoing carry.
     """
 
+    __slots__ = ('carry_num', 'start_time', 'finish_time', 'unit_count',
+                 'origin', 'dest', 'trips', 'stow_time', 'dock_time',
+                 '_trip_distance_total', '_trip_time_total',
+                 'total_distance', 'avg_trip_distance', 'avg_trip_time')
+
+    # free list of retired Trip instances shared by all carries;
+    # re-initializing one skips allocation and GC registration
+    _trip_pool = []
+    _TRIP_POOL_CAP = 32
+
     def __init__(self, carry_num, start_time, start_loc):
         """
         Constructs an open carry.
@@ -125,36 +187,41 @@ class Carry(object):
         self.trips = []
         self.stow_time = 0
         self.dock_time = 0
+        # running totals folded in as each trip finishes, so
+        # finished() needs no second pass over the trips
+        self._trip_distance_total = 0.0
+        self._trip_time_total = 0.0
         self.total_distance = 0
         self.avg_trip_distance = 0
         self.avg_trip_time = 0
         self.append_trip(start_time, start_loc)
 
     def __repr__(self):
-        return '[{} to {}]'.format(self.origin, self.dest)
+        return f'[{self.origin} to {self.dest}]'
 
-    def add_stow_time(self, prev_loc_time, curr_loc_time):
+    def add_stow_time(self, delta_seconds):
         """
         Updates the stow time.
 
-        :param prev_loc_time: Timestamp of the previous location data.
-        :type prev_loc_time: str
-        :param curr_loc_time: Timestamp of the current location data.
-        :type curr_loc_time: str
+        The caller passes the already-computed time delta, so this
+        tick-rate path performs no timestamp parsing.
+
+        :param delta_seconds: Seconds elapsed since the previous
+                              location data.
+        :type delta_seconds: float
         """
-        self.stow_time += get_time_delta(prev_loc_time, curr_loc_time)
+        self.stow_time += delta_seconds
 
-    def add_dock_time(self, prev_loc_time, curr_loc_time):
+    def add_dock_time(self, delta_seconds):
         """
         Updates the dock time.
 
-        :param prev_loc_time: Timestamp of the previous location data.
-        :type prev_loc_time: str
-        :param curr_loc_time: Timestamp of the current location data.
-        :type curr_loc_time: str
+        :param delta_seconds: Seconds elapsed since the previous
+                              location data.
+        :type delta_seconds: float
 
         """
-        self.dock_time += get_time_delta(prev_loc_time, curr_loc_time)
+        self.dock_time += delta_seconds
 
     def append_trip(self, start_time, start_loc):
         """
@@ -166,14 +233,51 @@ class Carry(object):
         :type start_loc: int
 
         """
-        self.trips.append(Trip(self.carry_num, start_time, start_loc))
+        pool = Carry._trip_pool
+        if pool:
+            trip = pool.pop()
+            trip.__init__(self.carry_num, start_time, start_loc)
+        else:
+            trip = Trip(self.carry_num, start_time, start_loc)
+        self.trips.append(trip)
+
+    def retire_trips(self):
+        """
+        Releases this carry's trips onto the shared free list.
+
+        Only invoke this once the trips' data has been persisted; the
+        instances are re-initialized and handed out again by
+        :func:`append_trip <models.Carry.append_trip>`.
+        """
+        pool = Carry._trip_pool
+        for trip in self.trips:
+            if len(pool) >= Carry._TRIP_POOL_CAP:
+                break
+            pool.append(trip)
+        self.trips = []
+
+    def finish_trip(self, location, time):
+        """
+        Finalizes this carry's open trip and folds its distance and
+        travel time into the running totals.
+
+        :param location: The trip's end location ID.
+        :type location: int
+        :param time: The trip's end timestamp.
+        :type time: str
+        """
+        trip = self.trips[-1]
+        trip.finished(location, time)
+        self._trip_distance_total += trip.distance
+        self._trip_time_total += trip.travel_time
 
     def finished(self, location, item_count, time):
         """
         Finalizes this carry.
-        When this is invoked, the carry's total driven distance is computed
-        based on the distance driven during each trip this carry consists of.
-        The average trip distance and average trip duration are also computed.
+        When this is invoked, the carry's total driven distance and the
+        average trip distance and duration are derived from the totals
+        accumulated by
+        :func:`finish_trip <models.Carry.finish_trip>`.
 
         :param location: The current location ID.
         :type location: int
@@ -185,16 +289,12 @@ class Carry(object):
         self.dest = location
         self.unit_count = item_count
         self.finish_time = time
-
-        travel_time_accumulator = 0
-        for trip in self.trips:
-            self.total_distance += trip.distance
-            travel_time_accumulator += trip.travel_time
+        self.total_distance = self._trip_distance_total
 
         trip_count = len(self.trips)
         if trip_count > 0:
             self.avg_trip_distance = self.total_distance / trip_count
-            self.avg_trip_time = travel_time_accumulator / trip_count
+            self.avg_trip_time = self._trip_time_total / trip_count
 
 
 class Task(object):
@@ -202,6 +302,9 @@ class Task(object):
     Represents a task.
     """
 
+    __slots__ = ('task_id', 'complete', 'model', 'item_id', 'origin',
+                 'dest', 'start_time', 'finish_time', 'avg_speed')
+
     def __init__(self, task_id, model, origin, dest):
         """
         Constructs a task.
@@ -226,5 +329,5 @@ class Task(object):
         self.avg_speed = None
 
     def __repr__(self):
-        return '[Task-{} model: {} from: {} to: {} fin: {}]' \
-            .format(self.task_id, self.model, self.origin, self.dest, self.complete)
+        return (f'[Task-{self.task_id} model: {self.model} '
+                f'from: {self.origin} to: {self.dest} fin: {self.complete}]')